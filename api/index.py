@@ -4,6 +4,7 @@ import os
 import json
 import re
 from typing import List, Optional
+from functools import lru_cache
 import io
 # Removed dotenv and requests as they were mainly for Gemini
 
@@ -39,30 +40,76 @@ def preprocess_text(text: str) -> list:
     tokens = [t for t in tokens if len(t) > 2 and t not in stop_words]
     return tokens
 
-def calculate_match_score(user_tokens: list, occupation: dict) -> float:
-    """Calculate weighted match score between user tokens and occupation keywords."""
-    # Extract fields with different weights
-    occ_name = occupation.get('Okupasi', '')
-    unit_kompetensi = occupation.get('Unit_Kompetensi', '')
-    kuk_keywords = occupation.get('Kuk_Keywords', '')
-    
-    # Tokenize each field separately
-    name_tokens = set(preprocess_text(occ_name))
-    unit_tokens = set(preprocess_text(unit_kompetensi))
-    kuk_tokens = set(preprocess_text(kuk_keywords))
-    
-    user_token_set = set(user_tokens)
+# Field weights shared by scoring and gap ranking (name > keywords > unit)
+NAME_WEIGHT = 3.0
+KUK_WEIGHT = 2.0
+UNIT_WEIGHT = 1.5
+
+# A competency phrase counts as matched when the user covers at least this share of its tokens
+PHRASE_MATCH_THRESHOLD = 0.5
+
+def split_phrases(text: str) -> list:
+    """Split a comma-separated competency field, keeping commas inside parentheses."""
+    return [p.strip() for p in re.split(r',\s*(?![^()]*\))', text) if p.strip()]
+
+def _token_bits(tokens, vocab: dict) -> int:
+    """Encode tokens as a bitset over the shared vocabulary, growing it as needed."""
+    bits = 0
+    for t in tokens:
+        if t not in vocab:
+            vocab[t] = len(vocab)
+        bits |= 1 << vocab[t]
+    return bits
+
+def _phrase_entries(text: str, vocab: dict) -> list:
+    entries = []
+    for phrase in split_phrases(text):
+        bits = _token_bits(preprocess_text(phrase), vocab)
+        if bits:
+            entries.append((phrase, bits))
+    return entries
+
+@lru_cache(maxsize=1)
+def get_catalog() -> dict:
+    """Load occupations once and precompute token bitsets per field and per KUK/unit phrase."""
+    vocab = {}
+    occupations = []
+    for row in load_data():
+        occupations.append({
+            "row": row,
+            "name_bits": _token_bits(preprocess_text(row.get('Okupasi', '')), vocab),
+            "unit_bits": _token_bits(preprocess_text(row.get('Unit_Kompetensi', '')), vocab),
+            "kuk_bits": _token_bits(preprocess_text(row.get('Kuk_Keywords', '')), vocab),
+            "unit_phrases": _phrase_entries(row.get('Unit_Kompetensi', ''), vocab),
+            "kuk_phrases": _phrase_entries(row.get('Kuk_Keywords', ''), vocab),
+        })
+    return {"vocab": vocab, "occupations": occupations}
+
+def user_bits(user_tokens: list, vocab: dict) -> int:
+    """Encode user tokens over the catalog vocabulary; unknown tokens can never match."""
+    bits = 0
+    for t in user_tokens:
+        idx = vocab.get(t)
+        if idx is not None:
+            bits |= 1 << idx
+    return bits
+
+def calculate_match_score(user_set: int, occupation: dict) -> float:
+    """Calculate weighted match score between a user token bitset and a catalog occupation."""
+    name_bits = occupation["name_bits"]
+    unit_bits = occupation["unit_bits"]
+    kuk_bits = occupation["kuk_bits"]
     
     # Calculate matches with weights
-    name_matches = len(user_token_set.intersection(name_tokens))
-    unit_matches = len(user_token_set.intersection(unit_tokens))
-    kuk_matches = len(user_token_set.intersection(kuk_tokens))
+    name_matches = (user_set & name_bits).bit_count()
+    unit_matches = (user_set & unit_bits).bit_count()
+    kuk_matches = (user_set & kuk_bits).bit_count()
     
     # Weighted scoring (name is most important, then keywords, then unit)
-    weighted_score = (name_matches * 3.0) + (kuk_matches * 2.0) + (unit_matches * 1.5)
+    weighted_score = (name_matches * NAME_WEIGHT) + (kuk_matches * KUK_WEIGHT) + (unit_matches * UNIT_WEIGHT)
     
     # Normalize by total possible matches (with weights)
-    max_possible = (len(name_tokens) * 3.0) + (len(kuk_tokens) * 2.0) + (len(unit_tokens) * 1.5)
+    max_possible = (name_bits.bit_count() * NAME_WEIGHT) + (kuk_bits.bit_count() * KUK_WEIGHT) + (unit_bits.bit_count() * UNIT_WEIGHT)
     
     if max_possible == 0:
         return 0.0
@@ -76,11 +123,45 @@ def calculate_match_score(user_tokens: list, occupation: dict) -> float:
     
     return boosted_score / 100  # Return as 0-1 for consistency
 
+def _split_matched(phrases: list, user_set: int, weight: float):
+    matched, missing = [], []
+    for phrase, bits in phrases:
+        total = bits.bit_count()
+        covered = (user_set & bits).bit_count()
+        if covered / total >= PHRASE_MATCH_THRESHOLD:
+            matched.append(phrase)
+        else:
+            missing.append((weight * (total - covered), phrase))
+    return matched, missing
+
+def compute_gap(user_set: int, occupation: dict) -> dict:
+    """Matched vs. missing KUK and unit phrases, missing ones ranked by weighted uncovered tokens."""
+    matched_kuk, missing_kuk = _split_matched(occupation["kuk_phrases"], user_set, KUK_WEIGHT)
+    matched_unit, missing_unit = _split_matched(occupation["unit_phrases"], user_set, UNIT_WEIGHT)
+    # Stable sort keeps catalog order among equal weights
+    missing_kuk.sort(key=lambda x: x[0], reverse=True)
+    missing_unit.sort(key=lambda x: x[0], reverse=True)
+    return {
+        "matched_kuk": matched_kuk,
+        "missing_kuk": [p for _, p in missing_kuk],
+        "matched_unit": matched_unit,
+        "missing_unit": [p for _, p in missing_unit],
+    }
+
+def summarize_gap(gap: dict, limit: int = 3) -> str:
+    """Short human-readable gap line for the results card."""
+    missing = gap["missing_kuk"][:limit]
+    if not missing:
+        missing = gap["missing_unit"][:limit]
+    if not missing:
+        return "All key competencies matched."
+    return "Missing: " + ", ".join(missing)
+
 @app.post("/api/match-profile")
 async def match_profile(req: ProfileRequest):
-    pon_data = load_data()
+    catalog = get_catalog()
     
-    if not pon_data:
+    if not catalog["occupations"]:
         return {"error": "Database not found. Please ensure data/pon_data.json exists."}
 
     user_tokens = preprocess_text(req.text)
@@ -88,23 +169,28 @@ async def match_profile(req: ProfileRequest):
     if not user_tokens:
          return {"error": "No valid text found in profile to analyze."}
 
+    user_set = user_bits(user_tokens, catalog["vocab"])
+
     # Calculate Scores
     scores = []
-    for row in pon_data:
-        score = calculate_match_score(user_tokens, row)
-        scores.append((row, score))
+    for occ in catalog["occupations"]:
+        score = calculate_match_score(user_set, occ)
+        scores.append((occ, score))
     
     # Top K
     scores.sort(key=lambda x: x[1], reverse=True)
     top_results = scores[:req.top_k]
     
     results = []
-    for row, score in top_results:
+    for occ, score in top_results:
+        row = occ["row"]
+        gap = compute_gap(user_set, occ)
         results.append({
             "id": row.get('OkupasiID', 'N/A'),
             "nama": row.get('Okupasi', 'N/A'),
             "score": float(score), # Normalize for display if needed, but Jaccard is 0-1
-            "gap": "Match based on keyword overlap." 
+            "gap": summarize_gap(gap),
+            "gap_analysis": gap
         })
         
     return {"recommendations": results}
@@ -0,0 +1,327 @@
+"""Concurrent load generator for the FastAPI backend (api.index:app).
+
+Replays a mixed workload of /api/match-profile, /api/parse-cv and
+/api/courses at a fixed request rate and reports latency percentiles,
+error rates and event-loop stall time.
+
+Targets:
+  --target inprocess  run the app on this event loop via httpx.ASGITransport
+                      (stall time then includes the app's own blocking work)
+  --target uvicorn    start `uvicorn api.index:app` as a local subprocess
+  --target url        hit an already running server at --base-url
+
+Requires httpx (pip install httpx) in addition to api/requirements.txt.
+
+Example:
+  python scripts/load_test.py --target uvicorn --rps 50 --concurrency 20 --duration 30
+"""
+import argparse
+import asyncio
+import io
+import os
+import random
+import subprocess
+import sys
+import time
+
+try:
+    import httpx
+except ImportError:
+    print("[FAIL] httpx is required: pip install httpx")
+    sys.exit(1)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE_PROFILES = [
+    "Saya seorang software engineer dengan pengalaman di Python dan React. Saya ingin mencari pekerjaan remote.",
+    "Saya ingin menjadi data scientist python dengan machine learning dan SQL",
+    "Experienced in natural language processing, fine-tuning BERT models and building chatbots",
+    "Network administrator with Cisco routing, firewall configuration and cloud infrastructure",
+    "Saya ingin menjadi programmer python",
+]
+
+SAMPLE_CV_TEXT = "Curriculum Vitae - Python developer, FastAPI, SQL, machine learning, data analysis"
+
+
+def build_pdf(text: str) -> bytes:
+    """Build a minimal single-page PDF containing `text`."""
+    stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode("latin-1")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        b"/Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{i} 0 obj\n".encode() + body + b"\nendobj\n")
+    xref_pos = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for off in offsets:
+        out.write(f"{off:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_pos}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+def build_docx(text: str) -> bytes:
+    """Build a minimal DOCX containing `text` (requires python-docx)."""
+    import docx
+    doc = docx.Document()
+    for line in text.split(" - "):
+        doc.add_paragraph(line)
+    out = io.BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+
+def load_fixtures(pdf_path=None, docx_path=None) -> list:
+    """Return (filename, content, content_type) tuples used for /api/parse-cv."""
+    fixtures = []
+    if pdf_path:
+        with open(pdf_path, 'rb') as f:
+            fixtures.append((os.path.basename(pdf_path), f.read(), "application/pdf"))
+    else:
+        fixtures.append(("sample_cv.pdf", build_pdf(SAMPLE_CV_TEXT), "application/pdf"))
+
+    docx_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    if docx_path:
+        with open(docx_path, 'rb') as f:
+            fixtures.append((os.path.basename(docx_path), f.read(), docx_type))
+    else:
+        try:
+            fixtures.append(("sample_cv.docx", build_docx(SAMPLE_CV_TEXT), docx_type))
+        except ImportError:
+            print("[WARN] python-docx not installed, skipping DOCX fixture.")
+    return fixtures
+
+
+def parse_mix(spec: str) -> dict:
+    """Parse a workload mix like 'match=6,parse=2,courses=2' into weights."""
+    weights = {}
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ("match", "parse", "courses"):
+            raise argparse.ArgumentTypeError(f"Unknown endpoint in mix: {name!r}")
+        weights[name] = float(weight or 1)
+    if not any(w > 0 for w in weights.values()):
+        raise argparse.ArgumentTypeError("Mix must contain at least one positive weight.")
+    return weights
+
+
+async def send_request(client, kind: str, rng: random.Random, fixtures: list):
+    """Issue one request of the given kind and return the response."""
+    if kind == "match":
+        payload = {"text": rng.choice(SAMPLE_PROFILES), "top_k": 3}
+        return await client.post("/api/match-profile", json=payload)
+    if kind == "parse":
+        filename, content, content_type = rng.choice(fixtures)
+        return await client.post("/api/parse-cv", files={"file": (filename, content, content_type)})
+    return await client.get("/api/courses")
+
+
+def is_error(resp) -> bool:
+    """The API reports some failures as 200 with an {"error": ...} body."""
+    if resp.status_code >= 400:
+        return True
+    try:
+        data = resp.json()
+    except ValueError:
+        return True
+    return isinstance(data, dict) and "error" in data
+
+
+class StallMonitor:
+    """Measures event-loop stalls by checking how late a periodic sleep wakes up."""
+
+    def __init__(self, interval: float = 0.005, threshold: float = 0.010):
+        self.interval = interval
+        self.threshold = threshold
+        self.total_stall = 0.0
+        self.max_stall = 0.0
+        self.stall_count = 0
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = loop.time() - start - self.interval
+            if lag > self.threshold:
+                self.total_stall += lag
+                self.stall_count += 1
+                self.max_stall = max(self.max_stall, lag)
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def run_load(client, weights: dict, rps: float, concurrency: int, duration: float,
+                   fixtures: list, seed: int):
+    """Open-loop load: requests are scheduled at a fixed rate regardless of response time."""
+    rng = random.Random(seed)
+    kinds = [k for k, w in weights.items() if w > 0 and (k != "parse" or fixtures)]
+    kind_weights = [weights[k] for k in kinds]
+    semaphore = asyncio.Semaphore(concurrency)
+    results = {k: {"latencies": [], "errors": 0, "exceptions": 0} for k in kinds}
+    # Scheduled start -> actual start delay; grows when concurrency is the bottleneck
+    queue_delays = []
+
+    async def worker(kind: str, scheduled: float):
+        async with semaphore:
+            started = time.perf_counter()
+            queue_delays.append(started - scheduled)
+            try:
+                resp = await send_request(client, kind, rng, fixtures)
+                if is_error(resp):
+                    results[kind]["errors"] += 1
+            except Exception:
+                results[kind]["exceptions"] += 1
+            results[kind]["latencies"].append(time.perf_counter() - started)
+
+    monitor = StallMonitor()
+    monitor_task = asyncio.create_task(monitor.run())
+
+    total = int(rps * duration)
+    tasks = []
+    t0 = time.perf_counter()
+    for i in range(total):
+        scheduled = t0 + i / rps
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        kind = rng.choices(kinds, weights=kind_weights)[0]
+        tasks.append(asyncio.create_task(worker(kind, scheduled)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - t0
+
+    monitor_task.cancel()
+    try:
+        await monitor_task
+    except asyncio.CancelledError:
+        pass
+
+    return results, queue_delays, monitor, elapsed
+
+
+def print_report(results: dict, queue_delays: list, monitor: StallMonitor, elapsed: float):
+    print(f"\n{'endpoint':<10} {'count':>7} {'err%':>7} {'p50 ms':>9} {'p90 ms':>9} "
+          f"{'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    all_latencies = []
+    total_failed = 0
+    for kind, r in results.items():
+        lat = sorted(r["latencies"])
+        all_latencies.extend(lat)
+        failed = r["errors"] + r["exceptions"]
+        total_failed += failed
+        _print_row(kind, lat, failed)
+    all_latencies.sort()
+    _print_row("all", all_latencies, total_failed)
+
+    print(f"\nCompleted {len(all_latencies)} requests in {elapsed:.2f}s "
+          f"({len(all_latencies) / elapsed:.1f} req/s achieved)")
+    for kind, r in results.items():
+        if r["exceptions"]:
+            print(f"  {kind}: {r['exceptions']} transport exceptions")
+    queue_delays.sort()
+    print(f"Queue delay (concurrency limit): p50 {percentile(queue_delays, 50) * 1000:.1f} ms, "
+          f"p99 {percentile(queue_delays, 99) * 1000:.1f} ms")
+    print(f"Event-loop stalls (>{monitor.threshold * 1000:.0f} ms): {monitor.stall_count}, "
+          f"total {monitor.total_stall * 1000:.1f} ms "
+          f"({monitor.total_stall / elapsed * 100:.1f}% of run), max {monitor.max_stall * 1000:.1f} ms")
+
+
+def _print_row(name: str, lat: list, failed: int):
+    count = len(lat)
+    err_pct = (failed / count * 100) if count else 0.0
+    cols = [percentile(lat, p) * 1000 for p in (50, 90, 95, 99)] + [(lat[-1] if lat else 0.0) * 1000]
+    print(f"{name:<10} {count:>7} {err_pct:>6.1f}% " + " ".join(f"{c:>9.1f}" for c in cols))
+
+
+async def wait_for_health(base_url: str, timeout: float = 30.0):
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.perf_counter() < deadline:
+            try:
+                resp = await client.get("/api/health")
+                if resp.status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not become healthy within {timeout:.0f}s")
+
+
+async def main_async(args):
+    fixtures = load_fixtures(args.pdf, args.docx)
+    server = None
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=args.concurrency)
+
+    if args.target == "inprocess":
+        sys.path.insert(0, PROJECT_ROOT)
+        from api.index import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app),
+                                   base_url="http://testserver", timeout=timeout)
+    else:
+        base_url = args.base_url
+        if args.target == "uvicorn":
+            base_url = f"http://127.0.0.1:{args.port}"
+            print(f"Starting uvicorn api.index:app on port {args.port}...")
+            server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "api.index:app", "--port", str(args.port),
+                 "--log-level", "warning"],
+                cwd=PROJECT_ROOT,
+            )
+        client = httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits)
+
+    try:
+        if args.target != "inprocess":
+            await wait_for_health(str(client.base_url))
+        print(f"Target: {args.target} | rps={args.rps} concurrency={args.concurrency} "
+              f"duration={args.duration}s mix={args.mix}")
+        async with client:
+            results, queue_delays, monitor, elapsed = await run_load(
+                client, args.mix, args.rps, args.concurrency, args.duration, fixtures, args.seed)
+        print_report(results, queue_delays, monitor, elapsed)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent load test for the DTP API.")
+    parser.add_argument("--target", choices=["inprocess", "uvicorn", "url"], default="inprocess")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000",
+                        help="Server URL when --target url")
+    parser.add_argument("--port", type=int, default=8010, help="Port for --target uvicorn")
+    parser.add_argument("--rps", type=float, default=20.0, help="Requests per second to schedule")
+    parser.add_argument("--concurrency", type=int, default=10, help="Max in-flight requests")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("match=6,parse=2,courses=2"),
+                        help="Endpoint weights, e.g. match=6,parse=2,courses=2")
+    parser.add_argument("--pdf", help="PDF fixture for /api/parse-cv (default: generated)")
+    parser.add_argument("--docx", help="DOCX fixture for /api/parse-cv (default: generated)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the workload")
+    args = parser.parse_args()
+
+    if args.rps <= 0 or args.concurrency <= 0 or args.duration <= 0:
+        parser.error("--rps, --concurrency and --duration must be positive")
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()